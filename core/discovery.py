@@ -3,13 +3,21 @@
 from __future__ import annotations
 
 import os
-from typing import List, Set
+import time
+from typing import Iterator, List, Set
 
 import shodan
 
 
 DEFAULT_QUERY = 'ollama is running'
 DEFAULT_LIMIT = 500
+PAGE_SIZE = 100  # matches per Shodan search page
+MIN_REQUEST_INTERVAL = 1.0  # seconds; Shodan's API allows ~1 request/second
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0  # seconds, doubled on each retry
+# shodan.APIError carries only a message; these mark errors worth retrying.
+# Timeouts surface as "Unable to connect to Shodan" from the client library.
+_TRANSIENT_ERRORS = ("rate limit", "timed out", "timeout", "unable to connect")
 
 
 class DiscoveryError(Exception):
@@ -27,34 +35,94 @@ def _resolve_api_key(provided: str | None) -> str:
 	return key
 
 
-def discover_candidates(
+class _RateLimiter:
+	"""Space out calls so consecutive requests start at least `interval` apart."""
+
+	def __init__(self, interval: float) -> None:
+		self.interval = interval
+		self._last_call: float | None = None
+
+	def wait(self) -> None:
+		if self._last_call is not None:
+			delay = self.interval - (time.monotonic() - self._last_call)
+			if delay > 0:
+				time.sleep(delay)
+		self._last_call = time.monotonic()
+
+
+def _search_page(client: shodan.Shodan, query: str, page: int, limiter: _RateLimiter) -> dict:
+	"""Fetch one result page, retrying rate-limit/timeout errors with exponential backoff.
+
+	Other API errors (bad key, bad query) fail immediately.
+	"""
+
+	attempt = 0
+	while True:
+		limiter.wait()
+		try:
+			result = client.search(query, page=page)
+			return result if isinstance(result, dict) else {}
+		except shodan.APIError as exc:  # type: ignore[attr-defined]
+			if attempt == MAX_RETRIES or not _is_transient(exc):
+				raise DiscoveryError(f"Shodan query failed: {exc}") from exc
+			time.sleep(RETRY_BACKOFF * 2**attempt)
+			attempt += 1
+
+
+def _is_transient(exc: Exception) -> bool:
+	"""Whether a Shodan API error is a rate limit or timeout."""
+
+	message = str(exc).lower()
+	return any(marker in message for marker in _TRANSIENT_ERRORS)
+
+
+def _iter_matches(client: shodan.Shodan, query: str) -> Iterator[dict]:
+	"""Stream matches page by page at the API's rate limit."""
+
+	limiter = _RateLimiter(MIN_REQUEST_INTERVAL)
+	page = 1
+	while True:
+		result = _search_page(client, query, page, limiter)
+		matches = result.get("matches", [])
+		for match in matches:
+			if isinstance(match, dict):
+				yield match
+
+		total = result.get("total") or 0
+		if not matches or page * PAGE_SIZE >= total:
+			return
+		page += 1
+
+
+def iter_candidates(
 	query: str = DEFAULT_QUERY, limit: int = DEFAULT_LIMIT, api_key: str | None = None
-) -> List[str]:
-	"""Query Shodan once and return a capped, deduplicated list of IPs."""
+) -> Iterator[str]:
+	"""Yield deduplicated IPs as Shodan pages arrive, stopping at `limit`.
+
+	Errors surface as DiscoveryError while the generator is being consumed.
+	"""
 
 	if limit <= 0:
-		return []
+		return
 
 	resolved_key = _resolve_api_key(api_key)
 	client = shodan.Shodan(resolved_key)
 
-	try:
-		result = client.search(query, limit=limit)
-	except shodan.APIError as exc:  # type: ignore[attr-defined]
-		raise DiscoveryError(f"Shodan query failed: {exc}") from exc
-
-	matches = result.get("matches", []) if isinstance(result, dict) else []
-	candidates: List[str] = []
 	seen: Set[str] = set()
 
-	for match in matches:
-		ip = match.get("ip_str") if isinstance(match, dict) else None
+	for match in _iter_matches(client, query):
+		ip = match.get("ip_str")
 		if not ip or ip in seen:
 			continue
-		candidates.append(ip)
 		seen.add(ip)
-		if len(candidates) >= limit:
-			break
+		yield ip
+		if len(seen) >= limit:
+			return
+
 
-	return candidates
+def discover_candidates(
+	query: str = DEFAULT_QUERY, limit: int = DEFAULT_LIMIT, api_key: str | None = None
+) -> List[str]:
+	"""Page through Shodan and return a capped, deduplicated list of IPs."""
 
+	return list(iter_candidates(query, limit, api_key))
@@ -2,8 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import functools
+import ipaddress
 import os
-from typing import Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
 
 try:
     import geoip2.database
@@ -15,14 +21,70 @@ except ImportError:
 
 DEFAULT_GEOIP_DB = "GeoLite2-City.mmdb"
 GEOIP_DB_ENV = "GEOIP_DB_PATH"
+GEOIP_CACHE_SIZE = 100_000
+GEOIP_WORKERS = 4
 
 
-def _get_db_path() -> Optional[str]:
-    """Get the GeoIP database path from environment or default."""
-    path = os.getenv(GEOIP_DB_ENV, DEFAULT_GEOIP_DB)
-    if os.path.exists(path):
-        return path
-    return None
+def _get_db_path() -> str:
+    """
+    Get the GeoIP database path from environment or default. Existence is
+    checked when the reader is opened, so cache hits cost no syscall.
+    """
+    return os.getenv(GEOIP_DB_ENV, DEFAULT_GEOIP_DB)
+
+
+_READERS: Dict[str, "geoip2.database.Reader"] = {}
+_READER_LOCK = threading.Lock()
+# Dedicated so mmap page faults never queue behind the loop's default executor.
+_GEO_POOL = ThreadPoolExecutor(max_workers=GEOIP_WORKERS, thread_name_prefix="geoip")
+
+
+def _get_reader(db_path: str) -> "geoip2.database.Reader":
+    """
+    Return the process-wide reader for db_path, opening it on first use.
+    Readers are thread-safe; the lock only guards construction.
+    """
+    reader = _READERS.get(db_path)
+    if reader is not None:
+        return reader
+    with _READER_LOCK:
+        reader = _READERS.get(db_path)
+        if reader is None:
+            if not os.path.exists(db_path):
+                # Not cached by _lookup: the database may be installed later.
+                raise FileNotFoundError(db_path)
+            # MODE_AUTO mmaps the file and uses the C extension when present.
+            reader = geoip2.database.Reader(db_path, mode=geoip2.database.MODE_AUTO)
+            atexit.register(reader.close)
+            _READERS[db_path] = reader
+    return reader
+
+
+@functools.lru_cache(maxsize=GEOIP_CACHE_SIZE)
+def _lookup(db_path: str, ip: str) -> Optional[Tuple[Tuple[str, object], ...]]:
+    """
+    Cached database lookup. Misses are cached as None too, so repeat
+    unknown IPs skip the AddressNotFoundError path. Other errors (reader
+    failing to open, corrupt database) propagate and are not cached.
+    """
+    try:
+        response = _get_reader(db_path).city(ip)
+        
+        lat = response.location.latitude
+        lon = response.location.longitude
+        
+        if lat is None or lon is None:
+            return None
+        
+        return (
+            ("lat", lat),
+            ("lon", lon),
+            ("city", response.city.name),
+            ("region", response.subdivisions.most_specific.name if response.subdivisions else None),
+            ("country", response.country.name),
+        )
+    except (geoip2.errors.AddressNotFoundError, ValueError):
+        return None
 
 
 def geolocate_ip(ip: str) -> Optional[Dict[str, object]]:
@@ -33,28 +95,26 @@ def geolocate_ip(ip: str) -> Optional[Dict[str, object]]:
     if not GEOIP_AVAILABLE:
         return None
     
-    db_path = _get_db_path()
-    if not db_path:
+    # Private, loopback and reserved ranges are never in the database.
+    try:
+        if not ipaddress.ip_address(ip).is_global:
+            return None
+    except ValueError:
         return None
     
     try:
-        with geoip2.database.Reader(db_path) as reader:
-            response = reader.city(ip)
-            
-            lat = response.location.latitude
-            lon = response.location.longitude
-            
-            if lat is None or lon is None:
-                return None
-            
-            return {
-                "lat": lat,
-                "lon": lon,
-                "city": response.city.name,
-                "region": response.subdivisions.most_specific.name if response.subdivisions else None,
-                "country": response.country.name,
-            }
-    except (geoip2.errors.AddressNotFoundError, ValueError, FileNotFoundError):
-        return None
+        cached = _lookup(_get_db_path(), ip)
     except Exception:
+        # Missing database or reader failure: report no location, retry on the next call.
         return None
+    return dict(cached) if cached else None
+
+
+async def geolocate_ip_async(ip: str) -> Optional[Dict[str, object]]:
+    """
+    geolocate_ip for coroutines: runs the lookup on the GeoIP thread pool
+    so database reads overlap with in-flight requests instead of blocking
+    the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_GEO_POOL, geolocate_ip, ip)
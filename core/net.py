@@ -0,0 +1,116 @@
+"""Shared HTTP plumbing for talking to candidate endpoints."""
+
+from __future__ import annotations
+
+import functools
+import socket
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, List, Tuple
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+POOL_CONNECTIONS = 64  # distinct hosts kept in the pool manager
+POOL_MAXSIZE = 256  # sockets kept per host
+KEEPALIVE_IDLE = 30  # seconds idle before the first keepalive probe
+KEEPALIVE_INTERVAL = 20  # seconds between unanswered probes
+KEEPALIVE_COUNT = 3  # unanswered probes before the kernel drops the socket
+DNS_CACHE_TTL = 300  # seconds, for the aiohttp resolver cache
+
+
+@functools.lru_cache(maxsize=65536)
+def build_url(host: str, port: int, path: str) -> str:
+	"""Return an http URL for host, respecting an already provided scheme/port.
+
+	Cached: each host is verified and probed repeatedly with the same path.
+	"""
+
+	if host.startswith(("http://", "https://")):
+		base = host.rstrip("/")
+	else:
+		colon = host.find(":")
+		if colon != -1 and colon == host.rfind(":"):
+			# host already has a port
+			base = f"http://{host}"
+		else:
+			base = f"http://{host}:{port}"
+	return f"{base}{path}"
+
+
+def _keepalive_options() -> List[Tuple[int, int, int]]:
+	"""Socket options that let the kernel fail half-closed peers in ~90s."""
+
+	options = [
+		(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+		(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+	]
+	# The tuning knobs are platform specific (Linux has all three).
+	for name, value in (
+		("TCP_KEEPIDLE", KEEPALIVE_IDLE),
+		("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+		("TCP_KEEPCNT", KEEPALIVE_COUNT),
+	):
+		if hasattr(socket, name):
+			options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+	return options
+
+
+KEEPALIVE_OPTIONS = _keepalive_options()
+
+
+class KeepAliveAdapter(HTTPAdapter):
+	"""HTTPAdapter whose pooled sockets carry tuned TCP keepalive options."""
+
+	def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+		kwargs["socket_options"] = HTTPConnection.default_socket_options + KEEPALIVE_OPTIONS
+		super().init_poolmanager(*args, **kwargs)
+
+
+def create_session(
+	pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE
+) -> requests.Session:
+	"""Return a keep-alive session with a pooled adapter mounted for http(s).
+
+	The session is shared by unrelated callers (scanned hosts, API proxies), so
+	it never stores cookies: one host's Set-Cookie must not be replayed for
+	another client's request.
+	"""
+
+	session = requests.Session()
+	adapter = KeepAliveAdapter(
+		pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0
+	)
+	session.mount("http://", adapter)
+	session.mount("https://", adapter)
+	session.headers["Connection"] = "keep-alive"
+	session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+	return session
+
+
+def _keepalive_socket(addr_info: Tuple[Any, ...]) -> socket.socket:
+	"""aiohttp socket factory applying the same options as KeepAliveAdapter."""
+
+	family, type_, proto = addr_info[:3]
+	sock = socket.socket(family=family, type=type_, proto=proto)
+	for level, option, value in KEEPALIVE_OPTIONS:
+		sock.setsockopt(level, option, value)
+	return sock
+
+
+def create_connector(limit: int) -> aiohttp.TCPConnector:
+	"""Return an aiohttp connector with DNS caching and keepalive sockets."""
+
+	return aiohttp.TCPConnector(
+		limit=limit,
+		ttl_dns_cache=DNS_CACHE_TTL,
+		use_dns_cache=True,
+		socket_factory=_keepalive_socket,
+	)
+
+
+# Shared by verify and probe so a host verified on /api/tags reuses the same
+# socket for its /api/generate probe.
+SESSION = create_session()
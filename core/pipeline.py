@@ -0,0 +1,64 @@
+"""Blocking entry points for the verify/probe fan-out shared by the API and CLI."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from typing import Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, TypeVar
+
+try:
+	import uvloop
+	UVLOOP_AVAILABLE = True
+except ImportError:
+	UVLOOP_AVAILABLE = False
+
+from .probe import probe_nodes_async
+from .verify import verify_endpoints_async
+
+T = TypeVar("T")
+
+
+def _run(coro: Awaitable[T]) -> T:
+	"""Run a coroutine to completion, on uvloop when it is installed."""
+
+	if UVLOOP_AVAILABLE:
+		return uvloop.run(coro)
+	return asyncio.run(coro)
+
+
+def verify_all(endpoints: Sequence[str]) -> List[Dict[str, object]]:
+	"""Verify hosts concurrently on one event loop; progress lines are written in one batch.
+
+	Must not be called from a running event loop.
+	"""
+
+	msgs: List[str] = []
+	total = len(endpoints)
+	completed = 0
+
+	def report(result: Dict[str, object]) -> None:
+		nonlocal completed
+		completed += 1
+		status = "✓" if result.get("ok") else "✗"
+		msgs.append(f"[{completed}/{total}] {status} {result.get('ip')}")
+
+	results = _run(verify_endpoints_async(endpoints, on_result=report))
+	if msgs:
+		sys.stdout.write("\n".join(msgs) + "\n")
+		sys.stdout.flush()
+	return results
+
+
+def probe_all(
+	candidates: Sequence[Mapping[str, object]],
+	on_result: Optional[Callable[[Dict[str, object]], None]] = None,
+) -> List[Dict[str, object]]:
+	"""Probe verified endpoints (records with ip/models) concurrently on one event loop.
+
+	on_result, if given, is called on the loop with each result as it completes.
+	"""
+
+	if not candidates:
+		return []
+	targets = [(r["ip"], r.get("models") or []) for r in candidates]
+	return _run(probe_nodes_async(targets, on_result=on_result))
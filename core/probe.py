@@ -2,90 +2,94 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import time
-from typing import Dict, List, Mapping, MutableMapping, Sequence
+from typing import Callable, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 
+import aiohttp
+import orjson
 import requests
 
+from .net import SESSION, build_url, create_connector
+
 
 DEFAULT_PORT = 11434
 DEFAULT_TIMEOUT = 3.0
+DEFAULT_CONCURRENCY = 200
 PROBE_PATH = "/api/generate"
 PROBE_PROMPT = "Reply with exactly the word 'ping'."
 PROBE_PREFERENCE: List[str] = ["llama3", "phi", "mistral", "qwen"]
+_PREF_SET = frozenset(PROBE_PREFERENCE)
+
+
+class _NonAlphaTable(dict):
+	"""str.translate table that drops non-letters, filled in per code point on first sight."""
+
+	def __missing__(self, codepoint: int) -> int | None:
+		value = codepoint if chr(codepoint).isalpha() else None
+		self[codepoint] = value
+		return value
+
 
+# `text.translate(NON_ALPHA)` == "".join(ch for ch in text if ch.isalpha()), in C.
+NON_ALPHA = _NonAlphaTable({i: i if chr(i).isalpha() else None for i in range(128)})
 
-def _extract_response_text(resp: requests.Response) -> str:
+
+def _extract_response_text(body: bytes) -> str:
 	"""Pull response text regardless of whether body is JSON or plain text."""
 
-	text_body = resp.text or ""
+	text_body = None
 	try:
-		data = resp.json()
+		data = orjson.loads(body)
 		if isinstance(data, dict):
-			text_body = data.get("response") or data.get("message", {}).get("content") or text_body
-	except ValueError:
+			message = data.get("message")
+			text_body = data.get("response") or (
+				message.get("content") if isinstance(message, dict) else None
+			)
+	except orjson.JSONDecodeError:
 		pass
+	if not text_body:
+		# Only decode the raw bytes when the body is not a usable JSON reply.
+		text_body = body.decode("utf-8", errors="replace")
 	return text_body if isinstance(text_body, str) else str(text_body)
 
 
 def _is_ping(text: str) -> bool:
 	"""Check if the model replied with exactly 'ping' (case/spacing-insensitive)."""
 
-	normalized = "".join(ch for ch in text.lower() if ch.isalpha())
+	normalized = text.lower().translate(NON_ALPHA)
 	return normalized == "ping"
 
 
-def _build_url(host: str, port: int = DEFAULT_PORT, path: str = PROBE_PATH) -> str:
-	"""Return an http URL for the given host."""
+def select_probe_model(models: Sequence[str]) -> str | None:
+	"""Choose a model using preference list, else smallest name."""
 
-	if host.startswith("http://") or host.startswith("https://"):
-		base = host.rstrip("/")
-	elif ":" in host and host.count(":") == 1:
-		base = f"http://{host}"
-	else:
-		base = f"http://{host}:{port}"
-	return f"{base}{path}"
+	return _select_probe_model(tuple(models))
 
 
-def select_probe_model(models: Sequence[str]) -> str | None:
-	"""Choose a model using preference list, else smallest name."""
+@functools.lru_cache(maxsize=4096)
+def _select_probe_model(models: Tuple[str, ...]) -> str | None:
+	"""Cached body of select_probe_model; a host's model list rarely changes."""
 
 	normalized = [m.strip() for m in models if m]
 	if not normalized:
 		return None
 
 	lower_map = {m.lower(): m for m in normalized}
-	for preferred in PROBE_PREFERENCE:
-		if preferred in lower_map:
-			return lower_map[preferred]
+	if not _PREF_SET.isdisjoint(lower_map):
+		for preferred in PROBE_PREFERENCE:
+			if preferred in lower_map:
+				return lower_map[preferred]
 
 	# Fallback: pick by shortest name, then lexicographic for stability
-	return sorted(normalized, key=lambda m: (len(m), m))[0]
+	return min(normalized, key=lambda m: (len(m), m))
 
 
-def probe_node(
-	ip: str,
-	available_models: Sequence[str],
-	*,
-	timeout: float = DEFAULT_TIMEOUT,
-	port: int = DEFAULT_PORT,
-) -> Dict[str, object]:
-	"""Send a cheap probe to a single node/model and return metrics."""
+def _probe_payload(model: str) -> Dict[str, object]:
+	"""Build the deterministic /api/generate request body."""
 
-	model = select_probe_model(available_models)
-	if not model:
-		return {
-			"ip": ip,
-			"model": None,
-			"success": False,
-			"latency_ms": None,
-			"status_code": None,
-			"error": "no models available",
-			"ts": time.time(),
-		}
-
-	url = _build_url(ip, port=port, path=PROBE_PATH)
-	payload = {
+	return {
 		"model": model,
 		"prompt": PROBE_PROMPT,
 		"stream": False,
@@ -95,37 +99,128 @@ def probe_node(
 		},
 	}
 
-	start = time.perf_counter()
-	try:
-		resp = requests.post(url, json=payload, timeout=timeout)
-		latency_ms = int((time.perf_counter() - start) * 1000)
-	except requests.RequestException as exc:
-		return {
-			"ip": ip,
-			"model": model,
-			"success": False,
-			"latency_ms": None,
-			"status_code": None,
-			"error": str(exc),
-			"ts": time.time(),
-		}
 
-	text_body = _extract_response_text(resp)
-	success = resp.status_code == 200 and _is_ping(text_body)
-	error = None if success else ("unexpected_output" if resp.status_code == 200 else f"status {resp.status_code}")
+def _probe_failure(ip: str, model: str | None, error: str) -> Dict[str, object]:
+	"""Build a probe record for a request that never got a response."""
+
+	return {
+		"ip": ip,
+		"model": model,
+		"success": False,
+		"latency_ms": None,
+		"status_code": None,
+		"error": error,
+		"ts": time.time(),
+	}
+
+
+def _probe_result(
+	ip: str, model: str, status_code: int, text_body: str, latency_ms: int
+) -> Dict[str, object]:
+	"""Build a probe record from an upstream reply."""
+
+	success = status_code == 200 and _is_ping(text_body)
+	error = None if success else ("unexpected_output" if status_code == 200 else f"status {status_code}")
 
 	return {
 		"ip": ip,
 		"model": model,
 		"success": bool(success),
 		"latency_ms": latency_ms,
-		"status_code": resp.status_code,
+		"status_code": status_code,
 		"body": text_body,
 		"error": error,
 		"ts": time.time(),
 	}
 
 
+def probe_node(
+	ip: str,
+	available_models: Sequence[str],
+	*,
+	timeout: float = DEFAULT_TIMEOUT,
+	port: int = DEFAULT_PORT,
+	session: requests.Session | None = None,
+) -> Dict[str, object]:
+	"""Send a cheap probe to a single node/model and return metrics."""
+
+	model = select_probe_model(available_models)
+	if not model:
+		return _probe_failure(ip, None, "no models available")
+
+	url = build_url(ip, port, PROBE_PATH)
+
+	start = time.perf_counter()
+	try:
+		resp = (session or SESSION).post(url, json=_probe_payload(model), timeout=timeout)
+		latency_ms = int((time.perf_counter() - start) * 1000)
+	except requests.RequestException as exc:
+		return _probe_failure(ip, model, str(exc))
+
+	text_body = _extract_response_text(resp.content)
+	return _probe_result(ip, model, resp.status_code, text_body, latency_ms)
+
+
+async def _probe_node_async(
+	session: aiohttp.ClientSession,
+	sem: asyncio.Semaphore,
+	ip: str,
+	available_models: Sequence[str],
+	port: int,
+) -> Dict[str, object]:
+	"""Async counterpart of probe_node; holds a semaphore slot per host."""
+
+	model = select_probe_model(available_models)
+	if not model:
+		return _probe_failure(ip, None, "no models available")
+
+	url = build_url(ip, port, PROBE_PATH)
+
+	async with sem:
+		start = time.perf_counter()
+		try:
+			async with session.post(url, json=_probe_payload(model)) as resp:
+				body = await resp.read()
+				latency_ms = int((time.perf_counter() - start) * 1000)
+				status_code = resp.status
+		except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+			return _probe_failure(ip, model, str(exc) or type(exc).__name__)
+
+	return _probe_result(ip, model, status_code, _extract_response_text(body), latency_ms)
+
+
+async def probe_nodes_async(
+	targets: Iterable[Tuple[str, Sequence[str]]],
+	*,
+	concurrency: int = DEFAULT_CONCURRENCY,
+	timeout: float = DEFAULT_TIMEOUT,
+	port: int = DEFAULT_PORT,
+	on_result: Optional[Callable[[Dict[str, object]], None]] = None,
+) -> List[Dict[str, object]]:
+	"""Probe many (ip, models) pairs concurrently over one session.
+
+	on_result, if given, is called with each result as its host completes.
+	"""
+
+	sem = asyncio.Semaphore(concurrency)
+	connector = create_connector(concurrency)
+	async with aiohttp.ClientSession(
+		connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)
+	) as session:
+
+		async def probe_one(ip: str, models: Sequence[str]) -> Dict[str, object]:
+			try:
+				result = await _probe_node_async(session, sem, ip, models, port)
+			except Exception as exc:
+				# One bad host must not abort the batch.
+				result = _probe_failure(ip, select_probe_model(models), str(exc) or type(exc).__name__)
+			if on_result is not None:
+				on_result(result)
+			return result
+
+		return list(await asyncio.gather(*(probe_one(ip, models) for ip, models in targets)))
+
+
 def record_metric(
 	metrics: MutableMapping[str, MutableMapping[str, List[dict]]],
 	probe_result: Mapping[str, object],
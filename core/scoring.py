@@ -5,6 +5,12 @@ from __future__ import annotations
 import math
 from typing import Iterable, List, Mapping
 
+try:
+	import numpy as np
+	NUMPY_AVAILABLE = True
+except ImportError:
+	NUMPY_AVAILABLE = False
+
 
 MAX_SCORE = 100.0
 BASE_OK_SCORE = 60.0  # floor for any healthy endpoint
@@ -12,6 +18,7 @@ MODEL_BONUS_WEIGHT = 12.0  # bonus grows with model count, capped
 MODEL_BONUS_CAP = 20.0
 LATENCY_TARGET_MS = 500.0  # good latency target
 LATENCY_PENALTY_MAX = 40.0
+VECTORIZE_MIN_RECORDS = 1000  # below this the NumPy setup costs more than it saves
 
 
 def _model_bonus(models: Iterable[str]) -> float:
@@ -50,8 +57,47 @@ def score_verification(rec: Mapping[str, object]) -> float:
 	return max(0.0, min(score, MAX_SCORE))
 
 
-def rank_verifications(records: Iterable[Mapping[str, object]]) -> List[dict]:
-	"""Attach scores and return records sorted by best first."""
+def _latency_value(latency_ms: object) -> float:
+	return float(latency_ms) if isinstance(latency_ms, (int, float)) else 0.0
+
+
+def rank_verifications_vec(records: Iterable[Mapping[str, object]]) -> List[dict]:
+	"""NumPy version of rank_verifications; same scores and ordering."""
+
+	records = list(records)
+	ok = np.array([bool(r.get("ok")) for r in records], dtype=bool)
+	lat = np.array([_latency_value(r.get("latency_ms")) for r in records], dtype=float)
+	nmod = np.array([sum(1 for m in (r.get("models") or ()) if m) for r in records], dtype=float)
+
+	bonus = np.clip(MODEL_BONUS_WEIGHT * np.log10(1 + nmod), 0.0, MODEL_BONUS_CAP)
+	# Non-positive latencies fall below the target and clip to no penalty.
+	penalty = np.clip(
+		(lat / LATENCY_TARGET_MS - 1.0) * (LATENCY_PENALTY_MAX / 2), 0.0, LATENCY_PENALTY_MAX
+	)
+	score = np.where(ok, np.clip(BASE_OK_SCORE + bonus - penalty, 0.0, MAX_SCORE), 0.0)
+
+	ranked: List[dict] = []
+	for idx in np.argsort(-score, kind="stable"):
+		row = dict(records[idx])
+		row["score"] = float(score[idx])
+		ranked.append(row)
+	return ranked
+
+
+def rank_verifications(
+	records: Iterable[Mapping[str, object]], has_models: bool = False
+) -> List[dict]:
+	"""Attach scores and return records sorted by best first.
+
+	With has_models, records without any models are dropped before scoring.
+	"""
+
+	if has_models:
+		records = [r for r in records if r.get("models")]
+	if NUMPY_AVAILABLE:
+		records = list(records)
+		if len(records) >= VECTORIZE_MIN_RECORDS:
+			return rank_verifications_vec(records)
 
 	enriched: List[dict] = []
 	for rec in records:
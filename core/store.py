@@ -2,36 +2,210 @@
 
 from __future__ import annotations
 
+import atexit
+import contextlib
 import csv
+import functools
+import itertools
 import json
 import os
+import queue
 import sqlite3
-from typing import Iterable, List, Sequence
+import sys
+import threading
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple
 
 
 DEFAULT_DB_PATH = "darn.sqlite3"
 DB_PATH_ENV = "DARN_DB_PATH"
+STREAM_CHUNK_SIZE = 1000
+CSV_FETCH_SIZE = 1000
+STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection
+
+# Stored in PRAGMA user_version; bump it when adding a migration to _create_schema.
+_SCHEMA_VERSION = 3
+
+# verifications.models holds names joined by the ASCII unit separator; model
+# names never contain it, so no quoting/escaping is needed.
+MODELS_SEPARATOR = "\x1f"
+
+# Columns added to verifications after its first release.
+_LOCATION_COLUMNS = (
+	("lat", "REAL"),
+	("lon", "REAL"),
+	("city", "TEXT"),
+	("region", "TEXT"),
+	("country", "TEXT"),
+)
+
+# Databases whose schema has been created/migrated by this process.
+_SCHEMA_READY: Set[str] = set()
+_SCHEMA_LOCK = threading.Lock()
+
+# Per-thread {db_path: connection}; sqlite3 connections stay on their own thread.
+_TLS = threading.local()
+
+_INSERT_ENDPOINT_SQL = "INSERT OR IGNORE INTO endpoints (ip) VALUES (?)"
+_SELECT_ENDPOINTS_SQL = "SELECT ip FROM endpoints ORDER BY discovered_at ASC"
+_INSERT_PROBE_SQL = """
+	INSERT INTO probes (
+		ip, model, success, latency_ms, status_code, error, body
+	) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_VERIFICATION_COLUMNS = (
+	"ip", "ok", "models", "latency_ms", "error", "lat", "lon", "city", "region", "country",
+)
+# Rows per multi-row statement, kept under SQLite's default 999 bound parameters.
+_VERIFICATION_CHUNK = 999 // len(_VERIFICATION_COLUMNS)
+_INSERT_ENDPOINT_FROM_V_SQL = "INSERT OR IGNORE INTO endpoints (ip) SELECT ip FROM v"
+# `WHERE true` disambiguates the upsert clause from a join constraint.
+_UPSERT_VERIFICATION_FROM_V_SQL = f"""
+	INSERT INTO verifications ({", ".join(_VERIFICATION_COLUMNS)})
+	SELECT {", ".join(_VERIFICATION_COLUMNS)} FROM v WHERE true
+	ON CONFLICT(ip) DO UPDATE SET
+		ok=excluded.ok,
+		models=excluded.models,
+		latency_ms=excluded.latency_ms,
+		error=excluded.error,
+		lat=COALESCE(excluded.lat, lat),
+		lon=COALESCE(excluded.lon, lon),
+		city=COALESCE(excluded.city, city),
+		region=COALESCE(excluded.region, region),
+		country=COALESCE(excluded.country, country),
+		checked_at=CURRENT_TIMESTAMP
+"""
+
+# Background writer: (db_path, [(sql, rows), ...]) batches applied in order.
+_WRITE_QUEUE: "queue.Queue[Tuple[str, List[Tuple[str, list]]]]" = queue.Queue()
+_WRITER: threading.Thread | None = None
+_WRITER_LOCK = threading.Lock()
+
+# Per-DB read-only connections polled by data_version; shared across threads.
+_VERSION_CONNS: Dict[str, sqlite3.Connection] = {}
+_VERSION_LOCK = threading.Lock()
 
 
 def _db_path(path: str | None = None) -> str:
 	"""Resolve the SQLite file path, allowing override via env or argument."""
 
-	candidate = path or os.getenv(DB_PATH_ENV, DEFAULT_DB_PATH)
+	return _resolve_path(path or os.getenv(DB_PATH_ENV, DEFAULT_DB_PATH))
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_path(candidate: str) -> str:
+	"""Expand and absolutize a DB path; memoized since abspath reads the cwd."""
+
 	candidate = os.path.expanduser(candidate)
 	candidate = os.path.abspath(candidate)
 	return candidate
 
 
+@functools.lru_cache(maxsize=8)
 def _ensure_parent_dir(db_path: str) -> None:
-	"""Create parent directory for the DB file if it does not exist."""
+	"""Create parent directory for the DB file if it does not exist (once per path)."""
 
 	parent = os.path.dirname(db_path)
 	if parent and not os.path.exists(parent):
 		os.makedirs(parent, exist_ok=True)
 
 
-def _ensure_schema(conn: sqlite3.Connection) -> None:
-	"""Create required tables if needed."""
+def _connect(db_path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+	"""Open a connection tuned for the scan workload (WAL, relaxed fsync).
+
+	Autocommit mode: writers group their statements with _write_transaction.
+	"""
+
+	conn = sqlite3.connect(
+		db_path,
+		isolation_level=None,
+		cached_statements=STATEMENT_CACHE_SIZE,
+		check_same_thread=check_same_thread,
+	)
+	conn.execute("PRAGMA journal_mode=WAL")
+	conn.execute("PRAGMA synchronous=NORMAL")
+	conn.execute("PRAGMA temp_store=MEMORY")
+	conn.execute("PRAGMA mmap_size=268435456")  # 256MB
+	conn.execute("PRAGMA cache_size=-65536")  # 64MB
+	return conn
+
+
+def encode_models(models: Iterable[str] | None) -> str | None:
+	"""Serialize a model list for the verifications.models column."""
+
+	if models is None:
+		return None
+	return MODELS_SEPARATOR.join(str(m) for m in models)
+
+
+def decode_models(value: str | None) -> List[str]:
+	"""Parse a verifications.models value back into a list of names."""
+
+	return list(_split_models(value)) if value else []
+
+
+@functools.lru_cache(maxsize=4096)
+def _split_models(value: str) -> Tuple[str, ...]:
+	"""Split a stored models value; memoized since many hosts serve the same set."""
+
+	return tuple(value.split(MODELS_SEPARATOR))
+
+
+def _legacy_models(value: str) -> List[str]:
+	"""Parse a pre-v2 JSON models value, treating garbage as no models."""
+
+	try:
+		models = json.loads(value)
+	except json.JSONDecodeError:
+		return []
+	return [m for m in models if isinstance(m, str)] if isinstance(models, list) else []
+
+
+def _conn(db_path: str) -> sqlite3.Connection:
+	"""Return this thread's schema-ready connection to db_path, opening it once."""
+
+	conns: Dict[str, sqlite3.Connection] | None = getattr(_TLS, "conns", None)
+	if conns is None:
+		conns = _TLS.conns = {}
+	conn = conns.get(db_path)
+	if conn is None:
+		_ensure_parent_dir(db_path)
+		conn = _connect(db_path)
+		_ensure_schema(conn, db_path)
+		conns[db_path] = conn
+	return conn
+
+
+def get_connection(path: str | None = None) -> sqlite3.Connection:
+	"""Return the calling thread's long-lived, schema-ready connection.
+
+	Do not close it; it is reused by every store call on this thread.
+	"""
+
+	return _conn(_db_path(path))
+
+
+def _ensure_schema(conn: sqlite3.Connection, db_path: str) -> None:
+	"""Create required tables and migrate them, once per database per process."""
+
+	if db_path in _SCHEMA_READY:
+		return
+	with _SCHEMA_LOCK:
+		if db_path in _SCHEMA_READY:
+			return
+		# Only take the write lock when a migration is actually pending.
+		if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+			with _write_transaction(conn):
+				_create_schema(conn)
+		_SCHEMA_READY.add(db_path)
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+	"""Create required tables and apply migrations newer than PRAGMA user_version."""
+
+	version = conn.execute("PRAGMA user_version").fetchone()[0]
+	if version >= _SCHEMA_VERSION:
+		return
 
 	conn.execute(
 		"""
@@ -59,26 +233,24 @@ def _ensure_schema(conn: sqlite3.Connection) -> None:
 		)
 		"""
 	)
-	
-	# Migrate existing tables to add location columns if missing
-	try:
+
+	if version < 1:
+		# Tables created before geolocation existed lack the location columns.
 		cur = conn.execute("PRAGMA table_info(verifications)")
 		columns = {row[1] for row in cur.fetchall()}
-		if 'lat' not in columns:
-			conn.execute("ALTER TABLE verifications ADD COLUMN lat REAL")
-		if 'lon' not in columns:
-			conn.execute("ALTER TABLE verifications ADD COLUMN lon REAL")
-		if 'city' not in columns:
-			conn.execute("ALTER TABLE verifications ADD COLUMN city TEXT")
-		if 'region' not in columns:
-			conn.execute("ALTER TABLE verifications ADD COLUMN region TEXT")
-		if 'country' not in columns:
-			conn.execute("ALTER TABLE verifications ADD COLUMN country TEXT")
-		conn.commit()
-	except Exception:
-		# If migration fails, continue - table might not exist yet
-		pass
-	
+		for name, decl in _LOCATION_COLUMNS:
+			if name not in columns:
+				conn.execute(f"ALTER TABLE verifications ADD COLUMN {name} {decl}")
+
+	if version < 2:
+		# models used to be stored as a JSON array.
+		cur = conn.execute("SELECT ip, models FROM verifications WHERE models LIKE '[%'")
+		legacy = cur.fetchall()
+		conn.executemany(
+			"UPDATE verifications SET models = ? WHERE ip = ?",
+			[(encode_models(_legacy_models(value)), ip) for ip, value in legacy],
+		)
+
 	conn.execute(
 		"""
 		CREATE TABLE IF NOT EXISTS probes (
@@ -96,62 +268,142 @@ def _ensure_schema(conn: sqlite3.Connection) -> None:
 		"""
 	)
 
+	if version < 3:
+		conn.execute(
+			"CREATE INDEX IF NOT EXISTS idx_verifications_checked ON verifications(checked_at DESC)"
+		)
+		conn.execute(
+			"CREATE INDEX IF NOT EXISTS idx_verifications_ok_lat "
+			"ON verifications(ok, latency_ms) WHERE ok = 1"
+		)
+		conn.execute("CREATE INDEX IF NOT EXISTS idx_probes_ip_ts ON probes(ip, ts DESC)")
+
+	conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+
+@contextlib.contextmanager
+def _write_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+	"""Run a block in BEGIN IMMEDIATE ... COMMIT, rolling back on error."""
+
+	conn.execute("BEGIN IMMEDIATE")
+	try:
+		yield conn
+	except BaseException:
+		conn.rollback()
+		raise
+	conn.commit()
+
+
+def data_version(path: str | None = None) -> int:
+	"""Return a value that changes whenever the database content may have changed.
+
+	PRAGMA data_version on a dedicated connection that never writes, so commits
+	from any other connection, this process or another (the CLI, other server
+	workers), move it. Cheap enough to check per request (e.g. for HTTP ETags);
+	values are only comparable within one process.
+	"""
+
+	db_path = _db_path(path)
+	with _VERSION_LOCK:
+		conn = _VERSION_CONNS.get(db_path)
+		if conn is None:
+			_conn(db_path)  # create/migrate the schema on first use
+			conn = _VERSION_CONNS[db_path] = _connect(db_path, check_same_thread=False)
+		return conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+def _values_cte(rows: int) -> str:
+	"""Return a `WITH v(...) AS (VALUES ...)` prefix for `rows` verification rows."""
+
+	row = "(" + ", ".join("?" * len(_VERIFICATION_COLUMNS)) + ")"
+	return f"WITH v({', '.join(_VERIFICATION_COLUMNS)}) AS (VALUES {', '.join([row] * rows)})"
+
+
+def _endpoint_rows(endpoints: Iterable[str]) -> List[Tuple[str]]:
+	"""Normalize IPs into endpoints insert rows."""
+
+	return [(ip.strip(),) for ip in endpoints if ip]
+
+
+def _probe_rows(results: Sequence[dict]) -> List[tuple]:
+	"""Validate probe results into probes insert rows."""
+
+	payloads = []
+	for item in results:
+		if not isinstance(item, dict):
+			continue
+		ip = item.get("ip")
+		if not ip:
+			continue
+		model = item.get("model") if isinstance(item.get("model"), str) else None
+		success = 1 if item.get("success") else 0
+		latency = item.get("latency_ms") if isinstance(item.get("latency_ms"), (int, float)) else None
+		status_code = item.get("status_code") if isinstance(item.get("status_code"), int) else None
+		error = item.get("error") if isinstance(item.get("error"), str) else None
+		body = item.get("body") if isinstance(item.get("body"), str) else None
+		payloads.append((ip, model, success, latency, status_code, error, body))
+	return payloads
+
 
 def store_endpoints(endpoints: Iterable[str], path: str | None = None) -> int:
 	"""Persist endpoints, ignoring duplicates. Returns count inserted."""
 
-	endpoints = [ip.strip() for ip in endpoints if ip]
-	if not endpoints:
+	rows = _endpoint_rows(endpoints)
+	if not rows:
 		return 0
 
-	db_path = _db_path(path)
-	_ensure_parent_dir(db_path)
-
-	conn = sqlite3.connect(db_path)
-	try:
-		_ensure_schema(conn)
-		before = conn.total_changes
-		conn.executemany(
-			"INSERT OR IGNORE INTO endpoints (ip) VALUES (?)",
-			[(ip,) for ip in endpoints],
-		)
-		conn.commit()
-		inserted = conn.total_changes - before
-	finally:
-		conn.close()
+	conn = _conn(_db_path(path))
+	before = conn.total_changes
+	with _write_transaction(conn):
+		conn.executemany(_INSERT_ENDPOINT_SQL, rows)
+	inserted = conn.total_changes - before
 
 	return inserted
 
 
+def store_endpoints_stream(
+	endpoints: Iterable[str], path: str | None = None, chunk_size: int = STREAM_CHUNK_SIZE
+) -> int:
+	"""Persist endpoints from an iterator in fixed-size chunks. Returns count inserted.
+
+	Each chunk commits on its own so rows become visible while a slow
+	producer (e.g. paged discovery) is still running.
+	"""
+
+	conn = _conn(_db_path(path))
+	before = conn.total_changes
+	iterator = iter(endpoints)
+	while True:
+		chunk = list(itertools.islice(iterator, chunk_size))
+		if not chunk:
+			break
+		with _write_transaction(conn):
+			conn.executemany(_INSERT_ENDPOINT_SQL, _endpoint_rows(chunk))
+	return conn.total_changes - before
+
+
 def get_endpoint_count(path: str | None = None) -> int:
 	"""Return the number of stored endpoints, creating the DB/table if absent."""
 
-	db_path = _db_path(path)
-	_ensure_parent_dir(db_path)
-
-	conn = sqlite3.connect(db_path)
-	try:
-		_ensure_schema(conn)
-		cur = conn.execute("SELECT COUNT(*) FROM endpoints")
-		row = cur.fetchone()
-		return int(row[0]) if row else 0
-	finally:
-		conn.close()
+	conn = _conn(_db_path(path))
+	cur = conn.execute("SELECT COUNT(*) FROM endpoints")
+	row = cur.fetchone()
+	return int(row[0]) if row else 0
 
 
 def get_endpoints(path: str | None = None) -> List[str]:
 	"""Return all stored endpoint IPs."""
 
-	db_path = _db_path(path)
-	_ensure_parent_dir(db_path)
+	conn = _conn(_db_path(path))
+	cur = conn.execute(_SELECT_ENDPOINTS_SQL)
+	return [row[0] for row in cur.fetchall() if row and row[0]]
 
-	conn = sqlite3.connect(db_path)
-	try:
-		_ensure_schema(conn)
-		cur = conn.execute("SELECT ip FROM endpoints ORDER BY discovered_at ASC")
-		return [row[0] for row in cur.fetchall() if row and row[0]]
-	finally:
-		conn.close()
+
+def iter_endpoints(path: str | None = None) -> Iterator[str]:
+	"""Like get_endpoints, but yields IPs one at a time."""
+
+	rows = _stream_query(_db_path(path), _SELECT_ENDPOINTS_SQL)
+	return (row[0] for row in rows if row and row[0])
 
 
 def store_verifications(results: Sequence[dict], path: str | None = None) -> int:
@@ -160,133 +412,164 @@ def store_verifications(results: Sequence[dict], path: str | None = None) -> int
 	if not results:
 		return 0
 
-	db_path = _db_path(path)
-	_ensure_parent_dir(db_path)
-
-	conn = sqlite3.connect(db_path)
+	conn = _conn(_db_path(path))
+	before = conn.total_changes
+	payloads = []
+	for item in results:
+		ip = item.get("ip") if isinstance(item, dict) else None
+		if not ip:
+			continue
+		ok_val = 1 if item.get("ok") else 0
+		models = item.get("models") if isinstance(item, dict) else []
+		models_value = encode_models(models)
+		latency = item.get("latency_ms") if isinstance(item, dict) else None
+		error = item.get("error") if isinstance(item, dict) else None
+		lat = item.get("lat") if isinstance(item, dict) else None
+		lon = item.get("lon") if isinstance(item, dict) else None
+		city = item.get("city") if isinstance(item, dict) else None
+		region = item.get("region") if isinstance(item, dict) else None
+		country = item.get("country") if isinstance(item, dict) else None
+		payloads.append((ip, ok_val, models_value, latency, error, lat, lon, city, region, country))
+
+	# One statement per chunk for each table; both bind the same VALUES list.
+	with _write_transaction(conn):
+		for start in range(0, len(payloads), _VERIFICATION_CHUNK):
+			chunk = payloads[start : start + _VERIFICATION_CHUNK]
+			params = [value for row in chunk for value in row]
+			values = _values_cte(len(chunk))
+			conn.execute(f"{values} {_INSERT_ENDPOINT_FROM_V_SQL}", params)
+			conn.execute(f"{values} {_UPSERT_VERIFICATION_FROM_V_SQL}", params)
+	return conn.total_changes - before
+
+
+def _verifications_query(limit: int | None, only_ok: bool) -> Tuple[str, Tuple[int, ...]]:
+	"""Build the SELECT shared by fetch_verifications and iter_verifications."""
+
+	query = """
+		SELECT ip, ok, models, latency_ms, error, lat, lon, city, region, country, checked_at
+		FROM verifications
+	"""
+	if only_ok:
+		query += " WHERE ok = 1 ORDER BY latency_ms"
+	else:
+		query += " ORDER BY checked_at DESC"
+	params: Tuple[int, ...] = ()
+	if limit:
+		query += " LIMIT ?"
+		params = (limit,)
+	return query, params
+
+
+def _verification_record(row: Sequence) -> dict:
+	"""Turn a verifications row into the dict served by the API."""
+
+	ip, ok, models_value, latency, error, lat, lon, city, region, country, checked_at = row
+	result = {
+		"ip": ip,
+		"ok": bool(ok),
+		"models": decode_models(models_value),
+		"latency_ms": latency,
+		"error": error,
+		"checked_at": checked_at,
+	}
+	if lat is not None and lon is not None:
+		result["lat"] = lat
+		result["lon"] = lon
+	if city:
+		result["city"] = city
+	if region:
+		result["region"] = region
+	if country:
+		result["country"] = country
+	return result
+
+
+def fetch_verifications(
+	path: str | None = None, limit: int | None = None, only_ok: bool = False
+) -> List[dict]:
+	"""Return verification records as dicts (models decoded to lists).
+
+	By default all rows, newest first. With only_ok, healthy rows fastest
+	first (served by the partial ok/latency index).
+	"""
+
+	conn = _conn(_db_path(path))
+	cur = conn.execute(*_verifications_query(limit, only_ok))
+	return [_verification_record(row) for row in cur.fetchall()]
+
+
+def _stream_query(db_path: str, query: str, params: Tuple = ()) -> Iterator[tuple]:
+	"""Run query on a dedicated read connection and return a lazy row iterator.
+
+	The query executes immediately, so errors surface to the caller; rows are
+	then read from one WAL snapshot. The connection may be stepped from any
+	thread (e.g. a response streamed through a worker pool) and is closed when
+	the iterator is exhausted or discarded.
+	"""
+
+	_conn(db_path)  # create/migrate the schema on first use
+	conn = _connect(db_path, check_same_thread=False)
 	try:
-		_ensure_schema(conn)
-		before = conn.total_changes
-		payloads = []
-		for item in results:
-			ip = item.get("ip") if isinstance(item, dict) else None
-			if not ip:
-				continue
-			ok_val = 1 if item.get("ok") else 0
-			models = item.get("models") if isinstance(item, dict) else []
-			models_json = json.dumps(models) if models is not None else None
-			latency = item.get("latency_ms") if isinstance(item, dict) else None
-			error = item.get("error") if isinstance(item, dict) else None
-			lat = item.get("lat") if isinstance(item, dict) else None
-			lon = item.get("lon") if isinstance(item, dict) else None
-			city = item.get("city") if isinstance(item, dict) else None
-			region = item.get("region") if isinstance(item, dict) else None
-			country = item.get("country") if isinstance(item, dict) else None
-			payloads.append((ip, ok_val, models_json, latency, error, lat, lon, city, region, country))
-
-			# Ensure endpoint exists to satisfy FK; insert ignore
-		conn.executemany(
-			"INSERT OR IGNORE INTO endpoints (ip) VALUES (?)",
-			[(p[0],) for p in payloads],
-		)
-
-		conn.executemany(
-			"""
-			INSERT INTO verifications (ip, ok, models, latency_ms, error, lat, lon, city, region, country)
-			VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-			ON CONFLICT(ip) DO UPDATE SET
-				ok=excluded.ok,
-				models=excluded.models,
-				latency_ms=excluded.latency_ms,
-				error=excluded.error,
-				lat=COALESCE(excluded.lat, lat),
-				lon=COALESCE(excluded.lon, lon),
-				city=COALESCE(excluded.city, city),
-				region=COALESCE(excluded.region, region),
-				country=COALESCE(excluded.country, country),
-				checked_at=CURRENT_TIMESTAMP
-			""",
-			payloads,
-		)
-		conn.commit()
-		return conn.total_changes - before
-	finally:
+		cur = conn.execute(query, params)
+	except Exception:
 		conn.close()
+		raise
+	return _drain(conn, cur)
 
 
-def fetch_verifications(path: str | None = None) -> List[dict]:
-	"""Return all verification records as dicts (models parsed from JSON)."""
+def _drain(conn: sqlite3.Connection, cur: sqlite3.Cursor) -> Iterator[tuple]:
+	"""Yield cursor rows, closing the owning connection afterwards."""
 
-	db_path = _db_path(path)
-	_ensure_parent_dir(db_path)
-
-	conn = sqlite3.connect(db_path)
 	try:
-		_ensure_schema(conn)
-		cur = conn.execute(
-			"""
-			SELECT ip, ok, models, latency_ms, error, lat, lon, city, region, country, checked_at
-			FROM verifications
-			ORDER BY checked_at DESC
-			"""
-		)
-		rows = cur.fetchall()
+		yield from cur
 	finally:
 		conn.close()
 
-	results: List[dict] = []
-	for ip, ok, models_json, latency, error, lat, lon, city, region, country, checked_at in rows:
-		models_list = []
-		if models_json:
-			try:
-				models_list = json.loads(models_json)
-			except json.JSONDecodeError:
-				models_list = []
-		result = {
-			"ip": ip,
-			"ok": bool(ok),
-			"models": models_list,
-			"latency_ms": latency,
-			"error": error,
-			"checked_at": checked_at,
-		}
-		if lat is not None and lon is not None:
-			result["lat"] = lat
-			result["lon"] = lon
-		if city:
-			result["city"] = city
-		if region:
-			result["region"] = region
-		if country:
-			result["country"] = country
-		results.append(result)
 
-	return results
+def iter_verifications(
+	path: str | None = None, limit: int | None = None, only_ok: bool = False
+) -> Iterator[dict]:
+	"""Like fetch_verifications, but yields records one at a time."""
+
+	rows = _stream_query(_db_path(path), *_verifications_query(limit, only_ok))
+	return map(_verification_record, rows)
 
 
 def dump_verifications_csv(
 	file_path: str = "verifications.csv", path: str | None = None
 ) -> str:
-	"""Write all verification records to a CSV file. Returns the CSV path."""
-
-	records = fetch_verifications(path)
-	if not records:
-		return os.path.abspath(file_path)
+	"""Stream all verification records to a CSV file. Returns the CSV path."""
 
 	file_path = os.path.abspath(file_path)
-	parent = os.path.dirname(file_path)
-	if parent and not os.path.exists(parent):
-		os.makedirs(parent, exist_ok=True)
-
-	fieldnames = ["ip", "ok", "models", "latency_ms", "error", "checked_at"]
-	with open(file_path, "w", newline="", encoding="utf-8") as f:
-		writer = csv.DictWriter(f, fieldnames=fieldnames)
-		writer.writeheader()
-		for rec in records:
-			row = dict(rec)
-			# Store models as comma-separated string for readability
-			row["models"] = ",".join(rec.get("models", []) or [])
-			writer.writerow(row)
+	conn = _conn(_db_path(path))
+	cur = conn.execute(
+		"""
+		SELECT ip, ok, models, latency_ms, error, checked_at
+		FROM verifications
+		ORDER BY checked_at DESC
+		"""
+	)
+	cur.arraysize = CSV_FETCH_SIZE
+	try:
+		rows = cur.fetchmany()
+		if not rows:
+			return file_path
+
+		parent = os.path.dirname(file_path)
+		if parent and not os.path.exists(parent):
+			os.makedirs(parent, exist_ok=True)
+
+		with open(file_path, "w", newline="", encoding="utf-8") as f:
+			writer = csv.writer(f)
+			writer.writerow(["ip", "ok", "models", "latency_ms", "error", "checked_at"])
+			while rows:
+				for ip, ok, models_value, latency, error, checked_at in rows:
+					# Store models as comma-separated string for readability
+					models = ",".join(decode_models(models_value))
+					writer.writerow([ip, bool(ok), models, latency, error, checked_at])
+				rows = cur.fetchmany()
+	finally:
+		cur.close()
 
 	return file_path
 
@@ -294,26 +577,19 @@ def dump_verifications_csv(
 def fetch_probes(path: str | None = None, limit: int | None = None) -> List[dict]:
 	"""Return probe records as dicts, ordered by timestamp desc."""
 	
-	db_path = _db_path(path)
-	_ensure_parent_dir(db_path)
+	conn = _conn(_db_path(path))
 	
-	conn = sqlite3.connect(db_path)
-	try:
-		_ensure_schema(conn)
-		
-		query = """
-			SELECT ip, model, success, latency_ms, status_code, error, body, ts
-			FROM probes
-			ORDER BY ts DESC
-		"""
-		
-		if limit:
-			query += f" LIMIT {limit}"
-		
-		cur = conn.execute(query)
-		rows = cur.fetchall()
-	finally:
-		conn.close()
+	query = """
+		SELECT ip, model, success, latency_ms, status_code, error, body, ts
+		FROM probes
+		ORDER BY ts DESC
+	"""
+	
+	if limit:
+		query += f" LIMIT {limit}"
+	
+	cur = conn.execute(query)
+	rows = cur.fetchall()
 	
 	results: List[dict] = []
 	for ip, model, success, latency, status_code, error, body, ts in rows:
@@ -336,47 +612,96 @@ def store_probes(results: Sequence[dict], path: str | None = None) -> int:
 	if not results:
 		return 0
 
-	db_path = _db_path(path)
-	_ensure_parent_dir(db_path)
+	conn = _conn(_db_path(path))
+	before = conn.total_changes
 
-	conn = sqlite3.connect(db_path)
-	try:
-		_ensure_schema(conn)
-		before = conn.total_changes
-
-		payloads = []
-		for item in results:
-			if not isinstance(item, dict):
-				continue
-			ip = item.get("ip")
-			if not ip:
-				continue
-			model = item.get("model") if isinstance(item.get("model"), str) else None
-			success = 1 if item.get("success") else 0
-			latency = item.get("latency_ms") if isinstance(item.get("latency_ms"), (int, float)) else None
-			status_code = item.get("status_code") if isinstance(item.get("status_code"), int) else None
-			error = item.get("error") if isinstance(item.get("error"), str) else None
-			body = item.get("body") if isinstance(item.get("body"), str) else None
-			payloads.append((ip, model, success, latency, status_code, error, body))
-
-		if not payloads:
-			return 0
+	payloads = _probe_rows(results)
+	if not payloads:
+		return 0
 
-		conn.executemany(
-			"INSERT OR IGNORE INTO endpoints (ip) VALUES (?)",
-			[(p[0],) for p in payloads],
-		)
+	with _write_transaction(conn):
+		conn.executemany(_INSERT_ENDPOINT_SQL, [(p[0],) for p in payloads])
+		conn.executemany(_INSERT_PROBE_SQL, payloads)
+	return conn.total_changes - before
 
-		conn.executemany(
-			"""
-			INSERT INTO probes (
-				ip, model, success, latency_ms, status_code, error, body
-			) VALUES (?, ?, ?, ?, ?, ?, ?)
-			""",
-			payloads,
+
+def _writer_loop() -> None:
+	"""Apply queued write batches over this thread's long-lived connections."""
+
+	while True:
+		db_path, statements = _WRITE_QUEUE.get()
+		try:
+			conn = _conn(db_path)
+			with _write_transaction(conn):
+				for sql, rows in statements:
+					conn.executemany(sql, rows)
+		except Exception as exc:
+			# Never let one bad batch kill the thread; flush_writes waits on it.
+			print(f"store writer: dropped batch for {db_path}: {exc!r}", file=sys.stderr)
+		finally:
+			_WRITE_QUEUE.task_done()
+
+
+def _get_writer() -> threading.Thread:
+	"""Start the background writer thread on first use, or restart it if it died."""
+
+	global _WRITER
+	with _WRITER_LOCK:
+		if _WRITER is None or not _WRITER.is_alive():
+			if _WRITER is None:
+				atexit.register(flush_writes)
+			_WRITER = threading.Thread(target=_writer_loop, name="darn-store-writer", daemon=True)
+			_WRITER.start()
+	return _WRITER
+
+
+def _enqueue(path: str | None, statements: List[Tuple[str, list]]) -> None:
+	_get_writer()
+	_WRITE_QUEUE.put((_db_path(path), statements))
+
+
+def store_endpoints_async(endpoints: Iterable[str], path: str | None = None) -> None:
+	"""Queue endpoints for the background writer and return immediately."""
+
+	rows = _endpoint_rows(endpoints)
+	if rows:
+		_enqueue(path, [(_INSERT_ENDPOINT_SQL, rows)])
+
+
+def store_probes_async(results: Sequence[dict], path: str | None = None) -> None:
+	"""Queue probe results for the background writer and return immediately."""
+
+	payloads = _probe_rows(results)
+	if payloads:
+		_enqueue(
+			path,
+			[
+				(_INSERT_ENDPOINT_SQL, [(p[0],) for p in payloads]),
+				(_INSERT_PROBE_SQL, payloads),
+			],
 		)
-		conn.commit()
-		return conn.total_changes - before
-	finally:
-		conn.close()
 
+
+def flush_writes() -> None:
+	"""Block until every queued write has been applied (or dropped)."""
+
+	if _WRITER is None:
+		return
+	try:
+		_get_writer()
+	except RuntimeError:
+		# A dead writer cannot be restarted during interpreter shutdown;
+		# joining would wait forever on batches nobody will consume.
+		return
+	_WRITE_QUEUE.join()
+
+
+def reset_database(path: str | None = None) -> None:
+	"""Remove all stored rows; the schema and open connections stay valid."""
+
+	flush_writes()
+	conn = _conn(_db_path(path))
+	with _write_transaction(conn):
+		conn.execute("DELETE FROM probes")
+		conn.execute("DELETE FROM verifications")
+		conn.execute("DELETE FROM endpoints")
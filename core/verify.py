@@ -2,32 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
 import time
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional
 
+import aiohttp
+import orjson
 import requests
 
-from .geoip import geolocate_ip
+from .geoip import geolocate_ip, geolocate_ip_async
+from .net import SESSION, build_url, create_connector
+from .probe import NON_ALPHA
 
 DEFAULT_PORT = 11434
 DEFAULT_TIMEOUT = 1.5  # seconds, for /api/tags metadata
 INFERENCE_TIMEOUT = 40.0  # seconds, for actual model inference
+DEFAULT_CONCURRENCY = 200  # in-flight hosts for the async fan-out
 PATH = "/api/tags"  # choose tags to also learn available models
 
 
-def _build_url(host: str, port: int = DEFAULT_PORT, path: str = PATH) -> str:
-	"""Return a URL for the given host, respecting an already provided scheme/port."""
-
-	if host.startswith("http://") or host.startswith("https://"):
-		base = host.rstrip("/")
-	elif ":" in host and host.count(":") == 1:
-		# host already has a port
-		base = f"http://{host}"
-	else:
-		base = f"http://{host}:{port}"
-	return f"{base}{path}"
-
-
 def _extract_models(payload: object) -> List[str]:
 	"""Pull model names from the /api/tags payload."""
 
@@ -65,26 +58,58 @@ def _pick_probe_model(models: List[str]) -> Optional[str]:
 	return normalized[0] if normalized else None
 
 
-def _inference_probe(base_url: str, model: str, timeout: float) -> Optional[str]:
-	"""Call /api/chat once and return the assistant message text."""
+def _inference_payload(model: str) -> Dict[str, object]:
+	"""Build the /api/chat request body used to check for real output."""
 
-	url = f"{base_url}/api/chat"
-	payload = {
+	return {
 		"model": model,
 		"messages": [{"role": "user", "content": "Say hello"}],
 		"stream": False,
 	}
+
+
+def _message_content(data: object) -> Optional[str]:
+	"""Pull the assistant message text out of an /api/chat reply."""
+
+	message = data.get("message") if isinstance(data, dict) else None
+	content = message.get("content") if isinstance(message, dict) else None
+	return content if isinstance(content, str) else None
+
+
+def _inference_probe(
+	base_url: str, model: str, timeout: float, session: requests.Session = SESSION
+) -> Optional[str]:
+	"""Call /api/chat once and return the assistant message text."""
+
+	url = f"{base_url}/api/chat"
 	try:
-		resp = requests.post(url, json=payload, timeout=timeout)
+		resp = session.post(url, json=_inference_payload(model), timeout=timeout)
 		if resp.status_code != 200:
 			return None
-		data = resp.json()
+		data = orjson.loads(resp.content)
 	except Exception:
 		return None
 
-	message = data.get("message") if isinstance(data, dict) else None
-	content = message.get("content") if isinstance(message, dict) else None
-	return content if isinstance(content, str) else None
+	return _message_content(data)
+
+
+async def _inference_probe_async(
+	session: aiohttp.ClientSession, base_url: str, model: str, timeout: float
+) -> Optional[str]:
+	"""Async counterpart of _inference_probe sharing the caller's session."""
+
+	url = f"{base_url}/api/chat"
+	try:
+		async with session.post(
+			url, json=_inference_payload(model), timeout=aiohttp.ClientTimeout(total=timeout)
+		) as resp:
+			if resp.status != 200:
+				return None
+			data = orjson.loads(await resp.read())
+	except Exception:
+		return None
+
+	return _message_content(data)
 
 
 def _looks_like_language(text: str) -> bool:
@@ -94,70 +119,61 @@ def _looks_like_language(text: str) -> bool:
 		return False
 
 	tokens = text.split()
-	alphaish = 0
-	for token in tokens:
-		letters = "".join(ch for ch in token if ch.isalpha())
-		if letters:
-			alphaish += 1
+	alphaish = sum(1 for token in tokens if token.translate(NON_ALPHA))
 
 	return alphaish / max(len(tokens), 1) > 0.5
 
 
+def _failure(
+	ip: str, error: str, latency_ms: Optional[int] = None, models: Optional[List[str]] = None
+) -> Dict[str, object]:
+	"""Build a failed verification record."""
+
+	return {
+		"ip": ip,
+		"ok": False,
+		"models": models if models is not None else [],
+		"latency_ms": latency_ms,
+		"error": error,
+	}
+
+
 def verify_endpoint(
-	ip: str, timeout: float = DEFAULT_TIMEOUT, port: int = DEFAULT_PORT
+	ip: str,
+	timeout: float = DEFAULT_TIMEOUT,
+	port: int = DEFAULT_PORT,
+	*,
+	session: requests.Session | None = None,
 ) -> Dict[str, object]:
 	"""Probe a host once and report success, models, and latency."""
 
-	url = _build_url(ip, port=port)
+	session = session or SESSION
+	url = build_url(ip, port, PATH)
 	start = time.perf_counter()
 	try:
-		resp = requests.get(url, timeout=timeout)
+		resp = session.get(url, timeout=timeout)
 		latency_ms: Optional[int] = int((time.perf_counter() - start) * 1000)
 	except requests.RequestException as exc:
-		return {"ip": ip, "ok": False, "models": [], "latency_ms": None, "error": str(exc)}
+		return _failure(ip, str(exc))
 
 	if resp.status_code != 200:
-		return {
-			"ip": ip,
-			"ok": False,
-			"models": [],
-			"latency_ms": latency_ms,
-			"error": f"status {resp.status_code}",
-		}
+		return _failure(ip, f"status {resp.status_code}", latency_ms)
 
 	try:
-		payload = resp.json()
+		payload = orjson.loads(resp.content)
 	except ValueError as exc:
-		return {
-			"ip": ip,
-			"ok": False,
-			"models": [],
-			"latency_ms": latency_ms,
-			"error": f"invalid json: {exc}",
-		}
+		return _failure(ip, f"invalid json: {exc}", latency_ms)
 
 	models = _extract_models(payload)
-	base = _build_url(ip, port=port, path="").rstrip("/")
+	base = build_url(ip, port, "").rstrip("/")
 	probe_model = _pick_probe_model(models)
 
 	if not probe_model:
-		return {
-			"ip": ip,
-			"ok": False,
-			"models": models,
-			"latency_ms": latency_ms,
-			"error": "no_probe_model",
-		}
-
-	reply = _inference_probe(base, probe_model, INFERENCE_TIMEOUT)
+		return _failure(ip, "no_probe_model", latency_ms, models)
+
+	reply = _inference_probe(base, probe_model, INFERENCE_TIMEOUT, session)
 	if not reply or not _looks_like_language(reply):
-		return {
-			"ip": ip,
-			"ok": False,
-			"models": models,
-			"latency_ms": latency_ms,
-			"error": "inference_gibberish",
-		}
+		return _failure(ip, "inference_gibberish", latency_ms, models)
 
 	result = {"ip": ip, "ok": True, "models": models, "latency_ms": latency_ms}
 	
@@ -166,4 +182,79 @@ def verify_endpoint(
 	if geo:
 		result.update(geo)
 	
-	return result
\ No newline at end of file
+	return result
+
+
+async def _verify_endpoint_async(
+	session: aiohttp.ClientSession,
+	sem: asyncio.Semaphore,
+	ip: str,
+	port: int,
+) -> Dict[str, object]:
+	"""Async counterpart of verify_endpoint; holds a semaphore slot per host."""
+
+	url = build_url(ip, port, PATH)
+	async with sem:
+		start = time.perf_counter()
+		try:
+			async with session.get(url) as resp:
+				latency_ms: Optional[int] = int((time.perf_counter() - start) * 1000)
+				if resp.status != 200:
+					return _failure(ip, f"status {resp.status}", latency_ms)
+				try:
+					payload = orjson.loads(await resp.read())
+				except ValueError as exc:
+					return _failure(ip, f"invalid json: {exc}", latency_ms)
+		except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+			return _failure(ip, str(exc) or type(exc).__name__)
+
+		models = _extract_models(payload)
+		base = build_url(ip, port, "").rstrip("/")
+		probe_model = _pick_probe_model(models)
+
+		if not probe_model:
+			return _failure(ip, "no_probe_model", latency_ms, models)
+
+		reply = await _inference_probe_async(session, base, probe_model, INFERENCE_TIMEOUT)
+		if not reply or not _looks_like_language(reply):
+			return _failure(ip, "inference_gibberish", latency_ms, models)
+
+	result = {"ip": ip, "ok": True, "models": models, "latency_ms": latency_ms}
+
+	geo = await geolocate_ip_async(ip)
+	if geo:
+		result.update(geo)
+
+	return result
+
+
+async def verify_endpoints_async(
+	ips: Iterable[str],
+	*,
+	concurrency: int = DEFAULT_CONCURRENCY,
+	timeout: float = DEFAULT_TIMEOUT,
+	port: int = DEFAULT_PORT,
+	on_result: Optional[Callable[[Dict[str, object]], None]] = None,
+) -> List[Dict[str, object]]:
+	"""Verify many hosts concurrently over one session; results keep input order.
+
+	on_result, if given, is called with each result as its host completes.
+	"""
+
+	sem = asyncio.Semaphore(concurrency)
+	connector = create_connector(concurrency)
+	async with aiohttp.ClientSession(
+		connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)
+	) as session:
+
+		async def verify_one(ip: str) -> Dict[str, object]:
+			try:
+				result = await _verify_endpoint_async(session, sem, ip, port)
+			except Exception as exc:
+				# One bad host (e.g. an unencodable name) must not abort the batch.
+				result = _failure(ip, str(exc) or type(exc).__name__)
+			if on_result is not None:
+				on_result(result)
+			return result
+
+		return list(await asyncio.gather(*(verify_one(ip) for ip in ips)))
@@ -3,36 +3,61 @@
 from __future__ import annotations
 
 import os
+import sqlite3
 import sys
+import threading
+import uuid
+from typing import Iterable, Iterator
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-import requests
-from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+import orjson
 
-from core.discovery import DiscoveryError, discover_candidates
-from core.probe import probe_node
+from core.discovery import DiscoveryError, iter_candidates
 from core.scoring import rank_verifications
 from core.geoip import geolocate_ip
+from core.net import SESSION, build_url
+from core.pipeline import probe_all, verify_all
 from core.store import (
-_db_path,
+    data_version,
+    decode_models,
     dump_verifications_csv,
     fetch_verifications,
     fetch_probes,
+    flush_writes,
+    get_connection,
     get_endpoint_count,
     get_endpoints,
-    store_probes,
-    store_endpoints,
+    iter_endpoints,
+    iter_verifications,
+    reset_database,
+    store_probes_async,
+    store_endpoints_stream,
     store_verifications,
 )
-from core.verify import verify_endpoint
 from dotenv import load_dotenv
 
 DEFAULT_OLLAMA_PORT = 11434
 GENERATE_PATH = "/api/generate"
 
+# Module-level so every /ip/{ip} call hits the connection's statement cache.
+# One round trip: the verification row (kind 'v') first, then up to 100
+# probes (kind 'p') newest first, padded to a common column layout.
+_Q_IP_DETAILS = """
+    SELECT 'v' AS kind, ip, ok AS success, models, latency_ms, error, lat, lon, city, region,
+           country, checked_at AS ts, NULL AS model, NULL AS status_code, NULL AS body
+    FROM verifications WHERE ip = ?
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'p', ip, success, NULL, latency_ms, error, NULL, NULL, NULL, NULL, NULL,
+               ts, model, status_code, body
+        FROM probes WHERE ip = ? ORDER BY ts DESC LIMIT 100
+    )
+    ORDER BY kind DESC, ts DESC
+"""
+
 
 # Load variables from .env so the DB path/env overrides are available to the API.
 load_dotenv()
@@ -57,45 +82,85 @@ def read_root() -> dict[str, str]:
     return {"service": "DARN API", "docs": "/docs"}
 
 
-@app.get("/verifications")
-def list_verifications() -> dict[str, object]:
+# Rows encoded per chunk handed to the ASGI server.
+_STREAM_BATCH = 500
+_ETAG_SALT = uuid.uuid4().hex[:8]
+
+
+def _stream_items(items: Iterable[object]) -> Iterator[bytes]:
+    """Encode items as {"items": [...], "count": N} without materializing the list."""
+    buf = bytearray(b'{"items":[')
+    count = 0
+    for item in items:
+        if count:
+            buf += b","
+        buf += orjson.dumps(item)
+        count += 1
+        if count % _STREAM_BATCH == 0:
+            yield bytes(buf)
+            buf.clear()
+    buf += b'],"count":%d}' % count
+    yield bytes(buf)
+
+
+def _backfill_locations(records: Iterable[dict]) -> Iterator[dict]:
+    """Geolocate records missing lat/lon as they stream; persist the fixes at the end."""
+    needs_update = []
+    for rec in records:
+        if rec.get("lat") is None or rec.get("lon") is None:
+            geo = geolocate_ip(rec["ip"])
+            if geo:
+                rec.update(geo)
+                needs_update.append(rec)
+        yield rec
+
+    # Store updated records
+    if needs_update:
+        store_verifications(needs_update)
+
+
+def _etag() -> str:
+    """ETag for the stored dataset; the salt keeps versions from a previous run distinct."""
+    return f'"{_ETAG_SALT}-{data_version()}"'
+
+
+@app.get("/verifications", response_model=None)
+def list_verifications(request: Request) -> Response:
+    etag = _etag()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
     try:
-        records = fetch_verifications()
-        
-        # Backfill missing locations
-        needs_update = []
-        for rec in records:
-            if rec.get("lat") is None or rec.get("lon") is None:
-                geo = geolocate_ip(rec["ip"])
-                if geo:
-                    rec.update(geo)
-                    needs_update.append(rec)
-        
-        # Store updated records
-        if needs_update:
-            store_verifications(needs_update)
-            
+        records = iter_verifications()
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
-    return {"count": len(records), "items": records}
-
-
-@app.get("/endpoints")
-def list_endpoints() -> dict[str, object]:
+    return StreamingResponse(
+        _stream_items(_backfill_locations(records)),
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
+
+
+@app.get("/endpoints", response_model=None)
+def list_endpoints(request: Request) -> Response:
+    etag = _etag()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
     try:
-        endpoints = get_endpoints()
+        endpoints = iter_endpoints()
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
-    return {"count": len(endpoints), "items": endpoints}
+    return StreamingResponse(
+        _stream_items(endpoints), media_type="application/json", headers={"ETag": etag}
+    )
 
 
 @app.api_route("/ipapi/{path:path}", methods=["GET", "OPTIONS"])
 def ipapi_proxy(path: str):
     url = f"https://ipapi.co/{path}"
     try:
-        r = requests.get(url, timeout=3)
+        r = SESSION.get(url, timeout=3)
         r.raise_for_status()  
-        return r.json()   
+        return orjson.loads(r.content)
     except requests.exceptions.RequestException as exc:
         return {"error": str(exc), "url": url, "status_code": getattr(r, "status_code", None)}
     except ValueError as exc:
@@ -105,9 +170,9 @@ def ipapi_proxy(path: str):
 def ipwho_proxy(path: str):
     url = f"https://ipwho.is/{path}"
     try:
-        r = requests.get(url, timeout=3)
+        r = SESSION.get(url, timeout=3)
         r.raise_for_status()
-        return r.json()
+        return orjson.loads(r.content)
     except requests.exceptions.RequestException as exc:
         return {"error": str(exc), "url": url, "status_code": getattr(r, "status_code", None)}
     except ValueError:
@@ -123,6 +188,13 @@ def list_probes(limit: int | None = None) -> dict[str, object]:
     return {"count": len(records), "items": records}
 
 
+def _probe_and_store(candidates: list[dict]) -> list[dict]:
+    """Probe candidates, handing each result to the store's background writer as it lands."""
+    results = probe_all(candidates, on_result=lambda result: store_probes_async([result]))
+    flush_writes()
+    return results
+
+
 @app.post("/run-probes")
 def run_probes() -> dict[str, object]:
     """Manually trigger a probe run on all verified endpoints."""
@@ -133,8 +205,8 @@ def run_probes() -> dict[str, object]:
         if not probe_candidates:
             return {"message": "No verified endpoints with models available", "probes_run": 0}
         
-        probe_results = [probe_node(r["ip"], r.get("models", [])) for r in probe_candidates]
-        probe_stored = store_probes(probe_results) if probe_results else 0
+        probe_results = _probe_and_store(probe_candidates)
+        probe_stored = len(probe_results)
         
         return {
             "message": f"Probed {len(probe_results)} endpoint(s)",
@@ -149,73 +221,38 @@ def run_probes() -> dict[str, object]:
 def get_ip_details(ip: str) -> dict[str, object]:
     """Get detailed information about a specific IP including verification and probe history."""
     try:
-        from core.store import _db_path
-        import sqlite3
-        
-        db_file = _db_path()
-        conn = sqlite3.connect(db_file)
+        # Per-thread WAL connection, kept open across requests
+        conn = get_connection()
         
-        # Fetch verification
-        cur = conn.execute(
-            "SELECT ip, ok, models, latency_ms, error, lat, lon, city, region, country, checked_at FROM verifications WHERE ip = ?",
-            (ip,)
-        )
-        verify_row = cur.fetchone()
-        if not verify_row:
-            conn.close()
+        # Named columns on this cursor only; the shared connection stays tuple-based
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        rows = cur.execute(_Q_IP_DETAILS, (ip, ip)).fetchall()
+        if not rows or rows[0]["kind"] != "v":
             raise HTTPException(status_code=404, detail=f"IP {ip} not found")
-        
-        models_json = verify_row[2]
-        models = []
-        if models_json:
-            try:
-                import json
-                models = json.loads(models_json)
-            except:
-                pass
+        verify_row = rows[0]
         
         verification = {
-            "ip": verify_row[0],
-            "ok": bool(verify_row[1]),
-            "models": models,
-            "latency_ms": verify_row[3],
-            "error": verify_row[4],
-            "checked_at": verify_row[10],
+            "ip": verify_row["ip"],
+            "ok": bool(verify_row["success"]),
+            "models": decode_models(verify_row["models"]),
+            "latency_ms": verify_row["latency_ms"],
+            "error": verify_row["error"],
+            "checked_at": verify_row["ts"],
         }
         
         # Add location data if available
-        if verify_row[5] is not None and verify_row[6] is not None:
-            verification["lat"] = verify_row[5]
-            verification["lon"] = verify_row[6]
-            if verify_row[7]:
-                verification["city"] = verify_row[7]
-            if verify_row[8]:
-                verification["region"] = verify_row[8]
-            if verify_row[9]:
-                verification["country"] = verify_row[9]
-        
-        # Fetch probes
-        cur = conn.execute(
-            """SELECT ip, model, success, latency_ms, status_code, error, body, ts 
-               FROM probes WHERE ip = ? ORDER BY ts DESC LIMIT 100""",
-            (ip,)
-        )
-        probe_rows = cur.fetchall()
-        probes = [
-            {
-                "ip": row[0],
-                "model": row[1],
-                "success": bool(row[2]),
-                "latency_ms": row[3],
-                "status_code": row[4],
-                "error": row[5],
-                "body": row[6],
-                "ts": row[7],
-            }
-            for row in probe_rows
-        ]
+        if verify_row["lat"] is not None and verify_row["lon"] is not None:
+            verification["lat"] = verify_row["lat"]
+            verification["lon"] = verify_row["lon"]
+            for key in ("city", "region", "country"):
+                if verify_row[key]:
+                    verification[key] = verify_row[key]
         
-        conn.close()
+        probe_keys = ("ip", "model", "success", "latency_ms", "status_code", "error", "body", "ts")
+        probes = [{key: row[key] for key in probe_keys} for row in rows[1:]]
+        for probe in probes:
+            probe["success"] = bool(probe["success"])
         
         return {"verification": verification, "probes": probes}
     except HTTPException:
@@ -228,23 +265,17 @@ def get_ip_details(ip: str) -> dict[str, object]:
 def list_ranked_choices() -> dict[str, object]:
     try:
         records = fetch_verifications()
-        ranked = rank_verifications(records)
+        # Only keep entries with available models
+        ranked = rank_verifications(records, has_models=True)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
-    # Only keep entries with available models
-    ranked = [r for r in ranked if r.get("models")]
     return {"count": len(ranked), "items": ranked}
 
 
 def _build_chat_url(ip: str, port: int = DEFAULT_OLLAMA_PORT, path: str = GENERATE_PATH) -> str:
-    if ip.startswith("http://") or ip.startswith("https://"):
-        base = ip.rstrip("/")
-    elif ":" in ip and ip.count(":") == 1:
-        base = f"http://{ip}"
-    else:
-        base = f"http://{ip}:{port}"
-    return f"{base}{path}"
+    # Same rules as the verify/probe URLs; memoized per (host, port, path)
+    return build_url(ip, port, path)
 
 
 @app.post("/chat/relay")
@@ -272,7 +303,7 @@ def chat_relay(
     }
 
     try:
-        resp = requests.post(url, json=payload, timeout=timeout)
+        resp = SESSION.post(url, json=payload, timeout=timeout)
     except requests.RequestException as exc:
         raise HTTPException(status_code=502, detail=f"Upstream error: {exc}") from exc
 
@@ -280,63 +311,66 @@ def chat_relay(
         raise HTTPException(status_code=resp.status_code, detail=resp.text)
 
     try:
-        data = resp.json()
+        data = orjson.loads(resp.content)
     except ValueError:
         data = {"text": resp.text}
 
     return {"upstream": url, "model": model, "ip": ip, "data": data}
 
 
+# Single-flight guard: a second /refresh while one is running gets a 409.
+_REFRESH_LOCK = threading.Lock()
+# Serializes the background CSV export with the next refresh's reset/truncate.
+_CSV_LOCK = threading.Lock()
+
+
+def _dump_csv() -> None:
+    """Background tail of /refresh: export the CSV outside the request."""
+    with _CSV_LOCK:
+        dump_verifications_csv()
+
+
 @app.post("/refresh")
-def refresh_all() -> dict[str, object]:
+def refresh_all(background_tasks: BackgroundTasks) -> dict[str, object]:
     """Delete stored data and re-run discovery + verification."""
+    if not _REFRESH_LOCK.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="Refresh already running")
     try:
-        # Delete SQLite DB
-        db_file = _db_path()
-        if os.path.exists(db_file):
-            os.remove(db_file)
-        
-        # Delete CSV
-        csv_file = os.path.abspath("verifications.csv")
-        if os.path.exists(csv_file):
-            os.remove(csv_file)
+        # Waits for a previous run's export still writing the CSV
+        with _CSV_LOCK:
+            # Clear stored data (keeps the DB file and its schema)
+            reset_database()
+            
+            # Empty the CSV in place (keeps the inode and page cache warm)
+            csv_file = os.path.abspath("verifications.csv")
+            if os.path.exists(csv_file):
+                open(csv_file, "w").close()
         
-        # Run discovery
+        # Run discovery, persisting endpoints as Shodan pages arrive
         try:
-            candidates = discover_candidates()
+            inserted = store_endpoints_stream(iter_candidates())
         except DiscoveryError as exc:
             raise HTTPException(status_code=500, detail=f"Discovery failed: {exc}") from exc
         
+        candidates = get_endpoints()
         if not candidates:
             return {"message": "No candidates found", "count": 0}
         
-        # Store endpoints
-        inserted = store_endpoints(candidates)
-        
-        # Verify endpoints in parallel
-        results = []
-        with ThreadPoolExecutor(max_workers=50) as executor:
-            future_to_ip = {executor.submit(verify_endpoint, ip): (idx, ip) for idx, ip in enumerate(candidates, 1)}
-            for future in as_completed(future_to_ip):
-                idx, ip = future_to_ip[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                    status = "✓" if result.get("ok") else "✗"
-                    print(f"[{len(results)}/{len(candidates)}] {status} {ip}")
-                except Exception as exc:
-                    print(f"[{len(results)+1}/{len(candidates)}] ✗ {ip} - {exc}")
-                    results.append({"ip": ip, "ok": False, "models": [], "latency_ms": None, "error": str(exc)})
+        # Verify endpoints concurrently
+        results = verify_all(candidates)
+        # Persisted before probing so a probe-phase failure cannot lose the run
         stored = store_verifications(results)
-        dump_verifications_csv()
         
         # Probe healthy endpoints
         probe_candidates = [r for r in results if r.get("ok") and r.get("models")]
-        probe_results = [probe_node(r["ip"], r.get("models", [])) for r in probe_candidates]
-        probe_stored = store_probes(probe_results) if probe_results else 0
+        probe_results = _probe_and_store(probe_candidates)
+        probe_stored = len(probe_results)
         
         healthy = sum(1 for r in results if r.get("ok"))
         
+        # Written after the response is sent; the client does not wait on it
+        background_tasks.add_task(_dump_csv)
+        
         return {
             "message": "Refresh complete",
             "discovered": inserted,
@@ -347,6 +381,8 @@ def refresh_all() -> dict[str, object]:
         }
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    finally:
+        _REFRESH_LOCK.release()
 
 
 def main() -> int:
@@ -357,16 +393,16 @@ def main() -> int:
         endpoints = get_endpoints()
     else:
         try:
-            candidates = discover_candidates()
+            inserted = store_endpoints_stream(iter_candidates())
         except DiscoveryError as exc:
             print(exc, file=sys.stderr)
             return 1
 
+        candidates = get_endpoints()
         if not candidates:
             print("No candidate endpoints found.")
             return 0
 
-        inserted = store_endpoints(candidates)
         endpoints = candidates
 
         print("Discovered candidate endpoints:")
@@ -378,20 +414,8 @@ def main() -> int:
         print("No endpoints available to verify.")
         return 0
 
-    results = []
-    print(f"Verifying {len(endpoints)} endpoints in parallel...")
-    with ThreadPoolExecutor(max_workers=50) as executor:
-        future_to_ip = {executor.submit(verify_endpoint, ip): (idx, ip) for idx, ip in enumerate(endpoints, 1)}
-        for future in as_completed(future_to_ip):
-            idx, ip = future_to_ip[future]
-            try:
-                result = future.result()
-                results.append(result)
-                status = "✓" if result.get("ok") else "✗"
-                print(f"[{len(results)}/{len(endpoints)}] {status} {ip}")
-            except Exception as exc:
-                print(f"[{len(results)+1}/{len(endpoints)}] ✗ {ip} - {exc}")
-                results.append({"ip": ip, "ok": False, "models": [], "latency_ms": None, "error": str(exc)})
+    print(f"Verifying {len(endpoints)} endpoints concurrently...")
+    results = verify_all(endpoints)
     stored = store_verifications(results)
     csv_path = dump_verifications_csv()
 
@@ -405,8 +429,8 @@ def main() -> int:
     print(f"Wrote CSV: {csv_path}")
 
     probe_candidates = [r for r in results if r.get("ok") and r.get("models")]
-    probe_results = [probe_node(r["ip"], r.get("models", [])) for r in probe_candidates]
-    probe_stored = store_probes(probe_results) if probe_results else 0
+    probe_results = _probe_and_store(probe_candidates)
+    probe_stored = len(probe_results)
 
     if probe_results:
         print("Probe results:")